@@ -3,62 +3,243 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+import re
+import secrets
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Protocol
+
+# StreamReader buffer limit. The pipe transport still reads at most 256 KiB per
+# os.read; the limit only sets how much is buffered before reading pauses, and so the
+# size of the blocks read() joins for exec-out photo transfers. It also caps the output
+# of a single persistent-shell command, since readuntil() raises LimitOverrunError
+# once that much arrives without the end marker.
+_READ_LIMIT = 1 << 20
+# One ``adb devices`` row in the ready state: "<serial><tab>device".
+_DEVICE_LINE = re.compile(rb"^(\S+)[ \t]+device\b", re.MULTILINE)
 
 
 class ADBError(RuntimeError):
     """Raised when adb returns a non-zero status."""
 
 
+class DeviceListerProtocol(Protocol):
+    async def list_devices(self) -> list[str]:
+        ...
+
+
+class DeviceShellProtocol(Protocol):
+    async def shell(self, serial: str, command: str, *, check: bool = True) -> str:
+        ...
+
+    async def exec_out_bytes(self, serial: str, command: str, *, check: bool = True) -> bytes:
+        ...
+
+
+class ADBClientProtocol(DeviceListerProtocol, DeviceShellProtocol, Protocol):
+    """Everything the service needs from an adb client."""
+
+
+class PersistentAdbShell:
+    """Long-lived ``adb -s SERIAL shell`` session fed commands over stdin.
+
+    Each command is framed by an end marker carrying its exit status, so many commands
+    share one adb process. Stderr is folded into the returned output. Any timeout,
+    cancellation, or lost session tears the process down; the next command respawns it.
+    One command's output is capped at ``_READ_LIMIT`` (1 MiB); larger output raises
+    :class:`ADBError`. Use ``exec_out_bytes`` or ``persistent_shell=False`` to get
+    uncapped output.
+    """
+
+    def __init__(self, *, executable: str, serial: str, command_timeout: float | None) -> None:
+        self.serial = serial
+        self._executable = executable
+        self._command_timeout = command_timeout
+        self._process: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+        token = secrets.token_hex(8)
+        # The empty quotes keep the echoed command text from matching the marker itself.
+        self._marker = f"__AMCCS_END_{token}_".encode()
+        self._echo_marker = f'echo __AMCCS_END_""{token}_$?'
+
+    async def run(self, command: str, *, check: bool = True) -> str:
+        async with self._lock:
+            try:
+                if self._command_timeout is None:
+                    output, returncode = await self._run(command)
+                else:
+                    output, returncode = await asyncio.wait_for(
+                        self._run(command),
+                        timeout=self._command_timeout,
+                    )
+            except asyncio.TimeoutError as exc:
+                await self.close()
+                raise ADBError(
+                    f"adb -s {self.serial} shell {command} timed out after "
+                    f"{self._command_timeout}s"
+                ) from exc
+            except asyncio.IncompleteReadError as exc:
+                await self.close()
+                details = exc.partial.decode("utf-8", errors="replace").strip()
+                raise ADBError(
+                    f"adb -s {self.serial} shell {command} failed: "
+                    f"{details or 'session closed unexpectedly'}"
+                ) from exc
+            except (asyncio.LimitOverrunError, OSError) as exc:
+                await self.close()
+                raise ADBError(f"adb -s {self.serial} shell {command} failed: {exc}") from exc
+            except BaseException:
+                # Cancelled mid-command: the framing is lost, so drop the session unawaited.
+                self._discard()
+                raise
+        if check and returncode != 0:
+            details = output.strip() or "no output"
+            raise ADBError(
+                f"adb -s {self.serial} shell {command} exited with {returncode}: {details}"
+            )
+        return output
+
+    async def close(self) -> None:
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+        with suppress(ProcessLookupError):
+            process.kill()
+        await process.wait()
+
+    async def _run(self, command: str) -> tuple[str, int]:
+        process = await self._ensure_process()
+        if process.stdin is None or process.stdout is None:
+            raise OSError("adb shell pipes are not available")
+        # A subshell keeps ``exit``/``cd`` from leaking into the session, and </dev/null
+        # stops commands from consuming the framing stream.
+        process.stdin.write(f"( {command}\n) </dev/null 2>&1\n{self._echo_marker}\n".encode())
+        await process.stdin.drain()
+        data = await process.stdout.readuntil(self._marker)
+        status = await process.stdout.readline()
+        output = data[: -len(self._marker)].decode("utf-8", errors="replace")
+        if not status.strip().isdigit():
+            raise asyncio.IncompleteReadError(data + status, None)
+        return output, int(status)
+
+    async def _ensure_process(self) -> asyncio.subprocess.Process:
+        if self._process is None or self._process.returncode is not None:
+            self._process = await asyncio.create_subprocess_exec(
+                self._executable,
+                "-s",
+                self.serial,
+                "shell",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=_READ_LIMIT,
+            )
+        return self._process
+
+    def _discard(self) -> None:
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            with suppress(ProcessLookupError):
+                process.kill()
+
+
 @dataclass(slots=True)
 class ADBClient:
     """Asynchronous helper for invoking adb commands."""
 
     executable: str = "adb"
     command_timeout: float | None = 15.0
+    persistent_shell: bool = True
+    _shells: dict[str, PersistentAdbShell] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
     async def list_devices(self) -> list[str]:
-        stdout, _, _ = await self._exec("devices")
-        devices: list[str] = []
-        for line in stdout.splitlines():
-            if not line or line.startswith("List of devices"):
-                continue
-            serial, *rest = line.split()
-            if rest and rest[0] == "device":
-                devices.append(serial)
+        stdout_bytes, _, _ = await self._exec_bytes("devices")
+        devices = [
+            serial.decode("utf-8", errors="replace")
+            for serial in _DEVICE_LINE.findall(stdout_bytes)
+        ]
+        await self._close_shells(exclude=devices)
         return devices
 
     async def shell(self, serial: str, command: str, *, check: bool = True) -> str:
-        stdout, _, _ = await self._exec("-s", serial, "shell", command, check=check)
-        return stdout
+        if not self.persistent_shell:
+            stdout, _, _ = await self._exec("-s", serial, "shell", command, check=check)
+            return stdout
+        session = self._shells.get(serial)
+        if session is None:
+            session = PersistentAdbShell(
+                executable=self.executable,
+                serial=serial,
+                command_timeout=self.command_timeout,
+            )
+            self._shells[serial] = session
+        return await session.run(command, check=check)
 
     async def pull(self, serial: str, remote: str, local: str, *, check: bool = True) -> None:
         await self._exec("-s", serial, "pull", remote, local, check=check)
 
+    async def exec_out_bytes(self, serial: str, command: str, *, check: bool = True) -> bytes:
+        """Run ``command`` via ``adb exec-out`` and return its raw, undecoded stdout."""
+
+        stdout_bytes, _, _ = await self._exec_bytes("-s", serial, "exec-out", command, check=check)
+        return stdout_bytes
+
+    async def aclose(self) -> None:
+        """Terminate every persistent shell session."""
+
+        await self._close_shells()
+
+    async def _close_shells(self, *, exclude: list[str] | None = None) -> None:
+        keep = set(exclude or ())
+        stale = [serial for serial in self._shells if serial not in keep]
+        for serial in stale:
+            await self._shells.pop(serial).close()
+
     async def _exec(self, *args: str, check: bool = True) -> tuple[str, str, int]:
+        stdout_bytes, stderr, returncode = await self._exec_bytes(*args, check=check)
+        return stdout_bytes.decode("utf-8", errors="replace"), stderr, returncode
+
+    async def _exec_bytes(self, *args: str, check: bool = True) -> tuple[bytes, str, int]:
         process = await asyncio.create_subprocess_exec(
             self.executable,
             *args,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            limit=_READ_LIMIT,
         )
         try:
             if self.command_timeout is None:
-                stdout_bytes, stderr_bytes = await process.communicate()
+                stdout_bytes, stderr_bytes = await self._collect(process)
             else:
                 stdout_bytes, stderr_bytes = await asyncio.wait_for(
-                    process.communicate(),
+                    self._collect(process),
                     timeout=self.command_timeout,
                 )
         except asyncio.TimeoutError as exc:
             process.kill()
             await process.wait()
             raise ADBError(f"adb {' '.join(args)} timed out after {self.command_timeout}s") from exc
-        stdout = stdout_bytes.decode("utf-8", errors="replace")
         stderr = stderr_bytes.decode("utf-8", errors="replace")
         returncode = int(process.returncode or 0)
         if check and returncode != 0:
             rendered_args = " ".join(args)
             details = stderr.strip() or "no stderr output"
             raise ADBError(f"adb {rendered_args} exited with {returncode}: {details}")
-        return stdout, stderr, returncode
+        return stdout_bytes, stderr, returncode
+
+    @staticmethod
+    async def _collect(process: asyncio.subprocess.Process) -> tuple[bytes, bytes]:
+        # No stdin to feed, so read both pipes directly instead of via communicate().
+        if process.stdout is None or process.stderr is None:
+            raise ADBError("adb pipes are not available")
+        stdout_bytes, stderr_bytes, _ = await asyncio.gather(
+            process.stdout.read(),
+            process.stderr.read(),
+            process.wait(),
+        )
+        return stdout_bytes, stderr_bytes
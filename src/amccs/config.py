@@ -2,14 +2,29 @@
 
 from __future__ import annotations
 
+import functools
+import json
+import os
 import re
+import tempfile
+from collections import OrderedDict
+from contextlib import suppress
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import yaml
 
-SAFE_REMOTE_PATH_PATTERN = re.compile(r"^[\w./-]+$")
+try:  # Prefer the LibYAML-backed loader; it parses an order of magnitude faster.
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+# ASCII-only: device paths are interpolated into adb shell commands.
+SAFE_REMOTE_PATH_PATTERN = re.compile(r"^[\w./-]+$", re.ASCII)
+CONFIG_CACHE_ENV_VAR = "AMCCS_CONFIG_CACHE"
+# Bump whenever the sidecar layout changes so stale files are ignored.
+_DISK_CACHE_VERSION = 1
 
 
 @dataclass(slots=True, frozen=True)
@@ -40,31 +55,108 @@ class Settings:
     defaults: CaptureDefaults
     timeout: float
     adb_command_timeout: float
+    adb_persistent_shell: bool = True
+    max_parallel_adb: int = 4
+
+
+_FieldSpec = tuple[str, Callable[[dict[str, Any], str], Any]]
+
+# Parsed settings keyed by (path, mtime_ns, size); entries are frozen and safe to share.
+_SETTINGS_CACHE: OrderedDict[tuple[str, int, int], Settings] = OrderedDict()
+_SETTINGS_CACHE_SIZE = 100
 
 
 def load_settings(path: Path) -> Settings:
-    """Load configuration from a YAML document."""
+    """Load configuration from a YAML document (or JSON, for ``.json`` paths).
+
+    Results are cached per file and reused until its mtime or size changes.
+    Setting ``AMCCS_CONFIG_CACHE=1`` also mirrors each YAML document into a JSON
+    sidecar (``config.yaml.json``) so later process starts can skip YAML parsing.
+    """
+
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    cached = _SETTINGS_CACHE.get(key)
+    if cached is not None:
+        _SETTINGS_CACHE.move_to_end(key)
+        return cached
+
+    settings = _build_settings(_read_document(path, stat))
+    _SETTINGS_CACHE[key] = settings
+    if len(_SETTINGS_CACHE) > _SETTINGS_CACHE_SIZE:
+        _SETTINGS_CACHE.popitem(last=False)
+    return settings
+
+
+def _read_document(path: Path, stat: os.stat_result) -> Any:
+    if path.suffix.lower() == ".json":
+        return json.loads(path.read_bytes())
+
+    use_disk_cache = os.getenv(CONFIG_CACHE_ENV_VAR) == "1"
+    if use_disk_cache:
+        cached = _read_disk_cache(path, stat)
+        if cached is not None:
+            return cached["document"]
+
+    document = yaml.load(path.read_bytes(), Loader=_YamlLoader)
+    if use_disk_cache:
+        _write_disk_cache(path, stat, document)
+    return document
+
+
+def _disk_cache_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+def _read_disk_cache(path: Path, stat: os.stat_result) -> dict[str, Any] | None:
+    try:
+        payload = json.loads(_disk_cache_path(path).read_bytes())
+    except (OSError, ValueError):
+        return None  # a missing or corrupt sidecar just means re-parsing
+    if not isinstance(payload, dict):
+        return None
+    stamp = (payload.get("version"), payload.get("mtime_ns"), payload.get("size"))
+    if stamp != (_DISK_CACHE_VERSION, stat.st_mtime_ns, stat.st_size):
+        return None
+    return payload
 
-    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+
+def _write_disk_cache(path: Path, stat: os.stat_result, document: Any) -> None:
+    payload = {
+        "version": _DISK_CACHE_VERSION,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "document": document,
+    }
+    cache_path = _disk_cache_path(path)
+    try:
+        encoded = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    except (TypeError, ValueError):
+        return  # YAML-only types (e.g. dates) cannot round-trip through JSON
+    try:
+        fd, temp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.")
+    except OSError:
+        return  # read-only config directory; caching is best effort
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(encoded)
+        os.replace(temp_name, cache_path)
+    except OSError:
+        with suppress(OSError):
+            os.unlink(temp_name)
+
+
+def _build_settings(document: Any) -> Settings:
+    raw = document or {}
     settings_raw = raw.get("settings") or {}
     defaults_raw = settings_raw.get("camera_defaults") or {}
     zoom_raw = defaults_raw.get("zoom_point") or {}
     delays_raw = defaults_raw.get("delays") or {}
 
     defaults = CaptureDefaults(
-        package=_require_str(defaults_raw, "package"),
-        activity=_require_str(defaults_raw, "activity"),
-        photo_location=_require_safe_remote_path(defaults_raw, "photo_location"),
-        zoom_point=ZoomPoint(
-            x=_require_int(zoom_raw, "x"),
-            y=_require_int(zoom_raw, "y"),
-        ),
-        delays=DelaySettings(
-            camera_open=_require_float(delays_raw, "camera_open"),
-            zoom=_require_float(delays_raw, "zoom"),
-            photo_capture=_require_float(delays_raw, "photo_capture"),
-            photo_save=_require_float(delays_raw, "photo_save"),
-        ),
+        **_read_fields(defaults_raw, _DEFAULT_FIELDS),
+        zoom_point=ZoomPoint(**_read_fields(zoom_raw, _ZOOM_FIELDS)),
+        delays=DelaySettings(**_read_fields(delays_raw, _DELAY_FIELDS)),
     )
 
     timeout = float(settings_raw.get("request_timeout_seconds", 30))
@@ -75,7 +167,25 @@ def load_settings(path: Path) -> Settings:
     if adb_timeout <= 0:
         raise ValueError("settings.adb_command_timeout_seconds must be > 0")
 
-    return Settings(defaults=defaults, timeout=timeout, adb_command_timeout=adb_timeout)
+    persistent_shell = settings_raw.get("adb_persistent_shell", True)
+    if not isinstance(persistent_shell, bool):
+        raise ValueError("settings.adb_persistent_shell must be true or false")
+
+    max_parallel_adb = int(settings_raw.get("max_parallel_adb", 4))
+    if max_parallel_adb <= 0:
+        raise ValueError("settings.max_parallel_adb must be > 0")
+
+    return Settings(
+        defaults=defaults,
+        timeout=timeout,
+        adb_command_timeout=adb_timeout,
+        adb_persistent_shell=persistent_shell,
+        max_parallel_adb=max_parallel_adb,
+    )
+
+
+def _read_fields(source: dict[str, Any], fields: tuple[_FieldSpec, ...]) -> dict[str, Any]:
+    return {name: require(source, name) for name, require in fields}
 
 
 def _require_str(source: dict[str, Any], key: str) -> str:
@@ -89,6 +199,8 @@ def _require_int(source: dict[str, Any], key: str) -> int:
     value = source.get(key)
     if value is None:
         raise ValueError(f"Field '{key}' must be provided")
+    if type(value) is int:
+        return value
     try:
         return int(value)
     except (TypeError, ValueError) as exc:
@@ -99,6 +211,8 @@ def _require_float(source: dict[str, Any], key: str) -> float:
     value = source.get(key)
     if value is None:
         raise ValueError(f"Field '{key}' must be provided")
+    if type(value) is float:
+        return value
     try:
         return float(value)
     except (TypeError, ValueError) as exc:
@@ -106,7 +220,11 @@ def _require_float(source: dict[str, Any], key: str) -> float:
 
 
 def _require_safe_remote_path(source: dict[str, Any], key: str) -> str:
-    value = _require_str(source, key)
+    return _validate_remote_path(key, _require_str(source, key))
+
+
+@functools.lru_cache(maxsize=256)
+def _validate_remote_path(key: str, value: str) -> str:
     if not SAFE_REMOTE_PATH_PATTERN.fullmatch(value):
         raise ValueError(
             (
@@ -119,3 +237,21 @@ def _require_safe_remote_path(source: dict[str, Any], key: str) -> str:
     if value.startswith("-"):
         raise ValueError(f"Field '{key}' cannot start with '-'")
     return value
+
+
+# Field tables consumed by _read_fields, in declaration order of each dataclass.
+_DEFAULT_FIELDS: tuple[_FieldSpec, ...] = (
+    ("package", _require_str),
+    ("activity", _require_str),
+    ("photo_location", _require_safe_remote_path),
+)
+_ZOOM_FIELDS: tuple[_FieldSpec, ...] = (
+    ("x", _require_int),
+    ("y", _require_int),
+)
+_DELAY_FIELDS: tuple[_FieldSpec, ...] = (
+    ("camera_open", _require_float),
+    ("zoom", _require_float),
+    ("photo_capture", _require_float),
+    ("photo_save", _require_float),
+)
@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Callable
 
-from .adb import ADBClient
+from .adb import DeviceListerProtocol
 
 
 @dataclass(slots=True)
@@ -19,24 +20,40 @@ PositionStrategy = Callable[[str, int], str | None]
 
 
 class DeviceManager:
-    """Discovers connected devices via adb."""
+    """Discovers connected devices via adb.
+
+    Results are reused for ``ttl`` seconds so back-to-back requests do not re-run
+    ``adb devices``; call :meth:`invalidate` to force a refresh.
+    """
 
     def __init__(
         self,
-        adb: ADBClient,
+        adb: DeviceListerProtocol,
         *,
         position_strategy: PositionStrategy | None = None,
+        ttl: float = 2.0,
     ) -> None:
         self._adb = adb
         self._position_strategy = position_strategy or self._default_position
+        self.ttl = ttl
+        self._cache: tuple[float, list[CameraDevice]] | None = None
 
     async def discover(self) -> list[CameraDevice]:
+        if self._cache is not None:
+            cached_at, cached = self._cache
+            if time.monotonic() - cached_at < self.ttl:
+                return list(cached)
+
         serials = await self._adb.list_devices()
         devices: list[CameraDevice] = []
         for index, serial in enumerate(serials):
             position = self._position_strategy(serial, index)
             devices.append(CameraDevice(serial=serial, identifier=serial, position=position))
-        return devices
+        self._cache = (time.monotonic(), devices)
+        return list(devices)
+
+    def invalidate(self) -> None:
+        self._cache = None
 
     @staticmethod
     def _default_position(_serial: str, index: int) -> str:
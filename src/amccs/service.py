@@ -9,16 +9,22 @@ import logging
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Annotated, Any, Iterable
+from typing import Annotated, Any, Iterable, Iterator
 
 from fastapi import Depends, FastAPI, HTTPException, Security
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from .adb import ADBClient, ADBError
+from .adb import ADBClient, ADBClientProtocol, ADBError
 from .config import Settings, load_settings
-from .devices import DeviceManager
+from .devices import CameraDevice, DeviceManager
 from .session import CaptureSession
-from .state_machine import CameraStateMachine
+from .state_machine import CameraStateMachine, CaptureArtifact
+
+try:  # Optional C serializer; stdlib json is used when it is missing.
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None  # type: ignore[assignment]
 
 SERVICE_NAME = "amccs"
 CONFIG_ENV_VAR = "CAMERA_CONFIG_PATH"
@@ -40,7 +46,7 @@ AuthCredentials = Annotated[HTTPAuthorizationCredentials | None, Security(auth_s
 def create_app(
     *,
     config_path: str | None = None,
-    adb_client: ADBClient | None = None,
+    adb_client: ADBClientProtocol | None = None,
     api_token: str | None = None,
     config_search_paths: Iterable[str | os.PathLike[str]] | None = None,
 ) -> FastAPI:
@@ -48,9 +54,12 @@ def create_app(
 
     _configure_logging()
 
+    owns_adb = adb_client is None
     state: dict[str, Any] = {
         "settings": None,
         "adb": adb_client,
+        "device_manager": None,
+        "transfer_slots": None,
         "config_path": config_path,
         "primed_machines": None,
         "api_token": api_token or os.getenv(API_TOKEN_ENV_VAR),
@@ -68,11 +77,18 @@ def create_app(
 
         state["settings"] = settings
         state["config_path"] = str(resolved_path)
+        state["device_manager"] = DeviceManager(_get_adb())
+        state["transfer_slots"] = asyncio.Semaphore(settings.max_parallel_adb)
         _log_event("config.loaded", path=str(resolved_path))
         try:
             yield
         finally:
             state["settings"] = None
+            state["device_manager"] = None
+            state["transfer_slots"] = None
+            if owns_adb and state["adb"] is not None:
+                await state["adb"].aclose()
+                state["adb"] = None
             _log_event("config.unloaded")
 
     app = FastAPI(
@@ -81,6 +97,8 @@ def create_app(
         version="1.0.0",
         lifespan=_lifespan,
     )
+    # Runtime state is reachable from the app so callers (e.g. tests) can inspect/reset it.
+    app.state.amccs = state
 
     capture_lock = asyncio.Lock()
 
@@ -90,14 +108,24 @@ def create_app(
             raise HTTPException(status_code=503, detail={"message": "Service not initialized"})
         return settings
 
-    def _get_adb() -> ADBClient:
+    def _get_adb() -> ADBClientProtocol:
         adb = state.get("adb")
         if adb is None:
             settings = _require_settings()
-            adb = ADBClient(command_timeout=settings.adb_command_timeout)
+            adb = ADBClient(
+                command_timeout=settings.adb_command_timeout,
+                persistent_shell=settings.adb_persistent_shell,
+            )
             state["adb"] = adb
         return adb
 
+    def _require_device_manager() -> DeviceManager:
+        # Shared so /health, /prime and /capture reuse one short-lived discovery cache.
+        device_manager = state.get("device_manager")
+        if device_manager is None:
+            raise HTTPException(status_code=503, detail={"message": "Service not initialized"})
+        return device_manager
+
     async def _authorize(credentials: AuthCredentials) -> None:
         token = state.get("api_token")
         if token is None:
@@ -108,7 +136,7 @@ def create_app(
     def _build_session() -> CaptureSession:
         settings = _require_settings()
         adb = _get_adb()
-        device_manager = DeviceManager(adb)
+        device_manager = _require_device_manager()
 
         def factory(device):
             return CameraStateMachine(
@@ -116,6 +144,8 @@ def create_app(
                 adb=adb,
                 defaults=settings.defaults,
                 position=device.position,
+                transfer_slots=state["transfer_slots"],
+                command_timeout=settings.adb_command_timeout,
             )
 
         return CaptureSession(device_manager=device_manager, state_machine_factory=factory)
@@ -134,31 +164,29 @@ def create_app(
     @app.get("/health")
     async def health() -> dict[str, Any]:
         adb = _get_adb()
-        device_manager = DeviceManager(adb)
-        devices = await device_manager.discover()
+        devices = await _require_device_manager().discover()
+        if not devices:
+            _log_event("health.reported", status="no-devices", devices=0)
+            return {"service": SERVICE_NAME, "status": "no-devices", "devices": []}
 
-        statuses: list[dict[str, Any]] = []
-        overall_ok = bool(devices)
-        for device in devices:
+        async def _probe(device: CameraDevice) -> dict[str, Any]:
             ok = True
             issues: list[str] = []
             try:
                 await adb.shell(device.serial, "echo ok", check=True)
             except Exception as exc:  # noqa: BLE001
                 ok = False
-                overall_ok = False
                 issues.append(str(exc))
-            statuses.append(
-                {
-                    "device_id": device.identifier,
-                    "serial": device.serial,
-                    "position": device.position,
-                    "ok": ok,
-                    "issues": issues,
-                }
-            )
-
-        status_text = "healthy" if overall_ok else ("no-devices" if not devices else "issues")
+            return {
+                "device_id": device.identifier,
+                "serial": device.serial,
+                "position": device.position,
+                "ok": ok,
+                "issues": issues,
+            }
+
+        statuses = await asyncio.gather(*(_probe(device) for device in devices))
+        status_text = "healthy" if all(status["ok"] for status in statuses) else "issues"
         _log_event("health.reported", status=status_text, devices=len(devices))
         return {"service": SERVICE_NAME, "status": status_text, "devices": statuses}
 
@@ -171,6 +199,7 @@ def create_app(
                 _log_event("prime.start")
                 machines = await session.prepare_all()
             except ADBError as exc:
+                _require_device_manager().invalidate()
                 _log_event("prime.failed", reason=str(exc))
                 raise HTTPException(status_code=502, detail={"message": str(exc)}) from exc
             except RuntimeError as exc:
@@ -182,7 +211,7 @@ def create_app(
         return {"service": SERVICE_NAME, "primed_devices": len(machines)}
 
     @app.post("/capture")
-    async def capture(_: None = Depends(_authorize)) -> dict[str, Any]:
+    async def capture(_: None = Depends(_authorize)) -> StreamingResponse:
         session = _build_session()
         settings = _require_settings()
 
@@ -201,6 +230,7 @@ def create_app(
                     detail={"message": "Capture timed out"},
                 ) from exc
             except ADBError as exc:
+                _require_device_manager().invalidate()
                 _log_event("capture.failed", reason=str(exc))
                 raise HTTPException(status_code=502, detail={"message": str(exc)}) from exc
             except RuntimeError as exc:
@@ -209,23 +239,40 @@ def create_app(
             finally:
                 state["primed_machines"] = None
 
-        payload: list[dict[str, Any]] = []
-        for artifact in artifacts:
-            encoded = base64.b64encode(artifact.image_bytes).decode("ascii")
-            payload.append(
-                {
-                    "device_id": artifact.serial,
-                    "position": artifact.position,
-                    "image_base64": encoded,
-                }
-            )
-
-        _log_event("capture.success", devices=len(payload))
-        return {"service": SERVICE_NAME, "count": len(payload), "devices": payload}
+        _log_event("capture.success", devices=len(artifacts))
+        return StreamingResponse(
+            _iter_capture_payload(artifacts),
+            media_type="application/json",
+        )
 
     return app
 
 
+def _iter_capture_payload(artifacts: list[CaptureArtifact]) -> Iterator[str]:
+    """Render the /capture JSON body one device at a time.
+
+    Only one image is base64-encoded at a time, and each artifact is dropped once its
+    entry is yielded. That avoids N base64 copies and one combined JSON string. Every
+    device's raw ``image_bytes`` is still held in ``artifacts`` when streaming starts,
+    so peak memory is N raw images plus one base64 entry.
+    """
+
+    yield f'{{"service": {json.dumps(SERVICE_NAME)}, "count": {len(artifacts)}, "devices": ['
+    artifacts.reverse()
+    separator = ""
+    while artifacts:
+        artifact = artifacts.pop()
+        entry = {
+            "device_id": artifact.serial,
+            "position": artifact.position,
+            "image_base64": base64.b64encode(artifact.image_bytes).decode("ascii"),
+        }
+        del artifact
+        yield separator + json.dumps(entry)
+        separator = ", "
+    yield "]}"
+
+
 def _resolve_config_path(
     override: str | None = None,
     extra_search_paths: Iterable[str | os.PathLike[str]] | None = None,
@@ -233,32 +280,31 @@ def _resolve_config_path(
     candidate = override or os.getenv(CONFIG_ENV_VAR)
     if candidate:
         path = _normalize_path(candidate)
-        if not path.exists():
+        if not os.path.isfile(path):
             raise FileNotFoundError(f"Configuration file not found at {path}")
-        return path
+        return Path(path)
 
-    search_candidates: list[Path] = []
+    search_candidates: list[str | os.PathLike[str]] = []
     env_search = os.getenv(CONFIG_SEARCH_PATHS_ENV_VAR)
     if env_search:
         for raw in env_search.split(os.pathsep):
             cleaned = raw.strip()
             if cleaned:
-                search_candidates.append(Path(cleaned))
+                search_candidates.append(cleaned)
 
     if extra_search_paths:
-        for configured in extra_search_paths:
-            search_candidates.append(Path(str(configured)))
+        search_candidates.extend(extra_search_paths)
 
     search_candidates.extend(DEFAULT_CONFIG_SEARCH_PATHS)
 
-    evaluated_paths: list[Path] = []
+    evaluated_paths: list[str] = []
     for candidate_path in search_candidates:
         path = _normalize_path(candidate_path)
+        if os.path.isfile(path):
+            return Path(path)
         evaluated_paths.append(path)
-        if path.exists():
-            return path
 
-    searched = ", ".join(str(p) for p in evaluated_paths)
+    searched = ", ".join(evaluated_paths)
     raise FileNotFoundError(
         (
             "Unable to locate configuration file. Set "
@@ -267,11 +313,8 @@ def _resolve_config_path(
     )
 
 
-def _normalize_path(candidate: str | os.PathLike[str]) -> Path:
-    path = Path(candidate).expanduser()
-    if not path.is_absolute():
-        path = Path.cwd() / path
-    return path
+def _normalize_path(candidate: str | os.PathLike[str]) -> str:
+    return os.path.abspath(os.path.expanduser(os.fspath(candidate)))
 
 
 def _configure_logging() -> None:
@@ -284,5 +327,13 @@ def _configure_logging() -> None:
 
 
 def _log_event(event: str, **fields: Any) -> None:
+    if not logger.isEnabledFor(logging.INFO):
+        return
     record = {"event": event, "service": SERVICE_NAME, **fields}
-    logger.info(json.dumps(record, sort_keys=True))
+    logger.info(_dump_log_record(record))
+
+
+def _dump_log_record(record: dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+    return json.dumps(record, sort_keys=True)
@@ -3,16 +3,18 @@
 from __future__ import annotations
 
 import asyncio
-import os
-import tempfile
-from contextlib import suppress
+import shlex
+from contextlib import AbstractAsyncContextManager, nullcontext, suppress
 from dataclasses import dataclass
 from enum import Enum, auto
-from pathlib import Path
 
-from .adb import ADBClient, ADBError
+from .adb import ADBError, DeviceShellProtocol
 from .config import CaptureDefaults
 
+# The photo wait polls up to 20 times, 0.3s apart (about 6s in total).
+_PHOTO_POLL_PASSES = 20
+_PHOTO_POLL_INTERVAL = 0.3
+
 
 class CapturePhase(Enum):
     IDLE = auto()
@@ -37,45 +39,64 @@ class CameraStateMachine:
         self,
         *,
         serial: str,
-        adb: ADBClient,
+        adb: DeviceShellProtocol,
         defaults: CaptureDefaults,
         position: str | None = None,
         skip_zoom: bool = False,
+        transfer_slots: asyncio.Semaphore | None = None,
+        command_timeout: float | None = None,
     ) -> None:
         self.serial = serial
         self._adb = adb
         self._defaults = defaults
         self._position = position
         self._skip_zoom = skip_zoom
+        # Bounds concurrent photo transfers across machines; the shutter press is not gated.
+        self._transfer_slots: AbstractAsyncContextManager[object] = (
+            transfer_slots if transfer_slots is not None else nullcontext()
+        )
         self.phase = CapturePhase.IDLE
 
+        # Defaults are frozen, so every command line can be rendered once up front.
+        point = defaults.zoom_point
+        self._cmd_force_stop = f"am force-stop {defaults.package}"
+        # Wake/unlock, folder setup and app launch share one adb round-trip. The
+        # shell exits with the status of ``am start``, the only step that is checked.
+        self._cmd_prepare = "; ".join(
+            (
+                "input keyevent KEYCODE_WAKEUP",
+                "sleep 0.1",
+                "input keyevent KEYCODE_MENU",
+                "sleep 0.1",
+                f"mkdir -p {defaults.photo_location}",
+                self._cmd_force_stop,
+                f"am start -n {defaults.package}/{defaults.activity}",
+            )
+        )
+        self._cmd_tap = f"input tap {point.x} {point.y}"
+        # Poll for the newest photo on the device rather than one adb call per try. The
+        # passes are split into batches so each call stays well inside ``command_timeout``
+        # (half of it is left for adb overhead) while the overall wait stays the same.
+        batch = _PHOTO_POLL_PASSES
+        if command_timeout is not None:
+            batch = max(1, min(batch, int(command_timeout / (2 * _PHOTO_POLL_INTERVAL))))
+        self._cmd_wait_latest = tuple(
+            self._wait_latest_command(
+                defaults.photo_location, min(batch, _PHOTO_POLL_PASSES - done)
+            )
+            for done in range(0, _PHOTO_POLL_PASSES, batch)
+        )
+
     async def prepare(self) -> None:
         if self.phase not in (CapturePhase.IDLE, CapturePhase.COMPLETE):
             return
         self.phase = CapturePhase.PREPARING
 
-        await self._adb.shell(self.serial, "input keyevent KEYCODE_WAKEUP", check=False)
-        await asyncio.sleep(0.1)
-        await self._adb.shell(self.serial, "input keyevent KEYCODE_MENU", check=False)
-        await asyncio.sleep(0.1)
-        await self._adb.shell(
-            self.serial,
-            f"mkdir -p {self._defaults.photo_location}",
-            check=False,
-        )
-
-        component = f"{self._defaults.package}/{self._defaults.activity}"
-        await self._adb.shell(self.serial, f"am force-stop {self._defaults.package}", check=False)
-        await self._adb.shell(self.serial, f"am start -n {component}", check=True)
+        await self._adb.shell(self.serial, self._cmd_prepare, check=True)
         await asyncio.sleep(self._defaults.delays.camera_open)
 
         if not self._skip_zoom:
-            point = self._defaults.zoom_point
-            await self._adb.shell(
-                self.serial,
-                f"input tap {point.x} {point.y}",
-                check=True,
-            )
+            await self._adb.shell(self.serial, self._cmd_tap, check=True)
             await asyncio.sleep(self._defaults.delays.zoom)
 
         self.phase = CapturePhase.PREPARED
@@ -85,17 +106,21 @@ class CameraStateMachine:
             raise RuntimeError("Device must be prepared before capture")
 
         self.phase = CapturePhase.CAPTURING
-        temp_path = Path(self._tmp_file())
         try:
             await self._adb.shell(self.serial, "input keyevent KEYCODE_VOLUME_DOWN", check=True)
             total_delay = self._defaults.delays.photo_capture + self._defaults.delays.photo_save
             await asyncio.sleep(total_delay)
 
-            remote_photo = await self._latest_photo()
-            await self._adb.pull(self.serial, remote_photo, str(temp_path), check=True)
+            remote_photo = shlex.quote(await self._latest_photo())
+            # Stream the photo straight into memory rather than pulling it to a temp file.
+            async with self._transfer_slots:
+                image_bytes = await self._adb.exec_out_bytes(
+                    self.serial,
+                    f"cat {remote_photo}",
+                    check=True,
+                )
             await self._adb.shell(self.serial, f"rm -f {remote_photo}", check=False)
 
-            image_bytes = temp_path.read_bytes()
             artifact = CaptureArtifact(
                 serial=self.serial,
                 position=self._position,
@@ -107,35 +132,28 @@ class CameraStateMachine:
             self.phase = CapturePhase.ERROR
             raise
         finally:
-            await self._cleanup(temp_path)
-            if temp_path.exists():
-                temp_path.unlink(missing_ok=True)
+            await self._cleanup()
 
     async def _latest_photo(self) -> str:
-        command = f"ls -t {self._defaults.photo_location}/*.jpg 2>/dev/null | head -1"
-        for _ in range(20):
-            output = (await self._adb.shell(self.serial, command, check=False)).strip().splitlines()
-            if output:
-                return output[0]
-            await asyncio.sleep(0.3)
+        for command in self._cmd_wait_latest:
+            output = await self._adb.shell(self.serial, command, check=False)
+            lines = output.strip().splitlines()
+            if lines:
+                return lines[0]
         raise ADBError("No photo captured")
 
-    async def _cleanup(self, temp_path: Path) -> None:
+    @staticmethod
+    def _wait_latest_command(photo_location: str, passes: int) -> str:
+        return (
+            f"for _ in $(seq {passes}); do "
+            f"f=$(ls -t {photo_location}/*.jpg 2>/dev/null | head -1); "
+            '[ -n "$f" ] && echo "$f" && break; '
+            f"sleep {_PHOTO_POLL_INTERVAL}; "
+            "done"
+        )
+
+    async def _cleanup(self) -> None:
         with suppress(Exception):
-            await self._adb.shell(
-                self.serial,
-                f"am force-stop {self._defaults.package}",
-                check=False,
-            )
+            await self._adb.shell(self.serial, self._cmd_force_stop, check=False)
         with suppress(Exception):
             await self._adb.shell(self.serial, "input keyevent KEYCODE_POWER", check=False)
-        if temp_path.exists():
-            try:
-                temp_path.chmod(0o600)
-            except OSError:
-                pass
-
-    def _tmp_file(self) -> str:
-        fd, temp_name = tempfile.mkstemp(suffix=".jpg", prefix=f"{self.serial}_")
-        os.close(fd)
-        return temp_name
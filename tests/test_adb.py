@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from amccs.adb import ADBClient, ADBError
+
+FAKE_ADB = """#!/bin/sh
+# Minimal adb stand-in: `-s SERIAL <shell|exec-out> [COMMAND]` runs COMMAND locally.
+if [ "$1" = "devices" ]; then
+    printf 'List of devices attached\\nSER1\\tdevice\\nSER2\\toffline\\n\\n'
+    exit 0
+fi
+shift 2
+shift
+if [ $# -eq 0 ]; then
+    exec sh
+fi
+exec sh -c "$1"
+"""
+
+
+@pytest.fixture
+def fake_adb(tmp_path: Path) -> ADBClient:
+    executable = tmp_path / "adb"
+    executable.write_text(FAKE_ADB, encoding="utf-8")
+    executable.chmod(0o755)
+    return ADBClient(executable=str(executable), command_timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_exec_out_bytes_returns_raw_stdout(fake_adb: ADBClient, tmp_path: Path) -> None:
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"\xff\xd8\x00binary\xff\xd9")
+
+    data = await fake_adb.exec_out_bytes("SER1", f"cat {photo}")
+
+    assert data == b"\xff\xd8\x00binary\xff\xd9"
+
+
+@pytest.mark.asyncio
+async def test_shell_reuses_one_persistent_session(fake_adb: ADBClient) -> None:
+    try:
+        first_pid = await fake_adb.shell("SER1", "echo $$")
+        second_pid = await fake_adb.shell("SER1", "echo $$")
+        unterminated = await fake_adb.shell("SER1", "printf no-newline")
+        stdin_reader = await fake_adb.shell("SER1", "cat")
+    finally:
+        await fake_adb.aclose()
+
+    assert first_pid == second_pid
+    assert unterminated == "no-newline"
+    assert stdin_reader == ""
+
+
+@pytest.mark.asyncio
+async def test_shell_reports_non_zero_exit_status(fake_adb: ADBClient) -> None:
+    try:
+        with pytest.raises(ADBError, match="exited with 3: nope"):
+            await fake_adb.shell("SER1", "echo nope >&2; exit 3")
+        assert await fake_adb.shell("SER1", "false", check=False) == ""
+        assert await fake_adb.shell("SER1", "echo still-alive") == "still-alive\n"
+    finally:
+        await fake_adb.aclose()
+
+
+@pytest.mark.asyncio
+async def test_shell_respawns_after_timeout(fake_adb: ADBClient) -> None:
+    fake_adb.command_timeout = 0.2
+    try:
+        with pytest.raises(ADBError, match="timed out"):
+            await fake_adb.shell("SER1", "sleep 1")
+        assert await fake_adb.shell("SER1", "echo back") == "back\n"
+    finally:
+        await fake_adb.aclose()
+
+
+@pytest.mark.asyncio
+async def test_exec_out_bytes_reads_large_payloads(fake_adb: ADBClient) -> None:
+    data = await fake_adb.exec_out_bytes("SER1", "head -c 3000000 /dev/zero")
+
+    assert len(data) == 3_000_000
+
+
+@pytest.mark.asyncio
+async def test_shell_output_is_capped_at_read_limit(fake_adb: ADBClient) -> None:
+    try:
+        with pytest.raises(ADBError):
+            await fake_adb.shell("SER1", "head -c 2000000 /dev/zero")
+        assert await fake_adb.shell("SER1", "echo back") == "back\n"
+    finally:
+        await fake_adb.aclose()
+
+
+@pytest.mark.asyncio
+async def test_list_devices_returns_only_ready_serials(fake_adb: ADBClient) -> None:
+    assert await fake_adb.list_devices() == ["SER1"]
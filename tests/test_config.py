@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import json
+import os
+from collections import OrderedDict
 from pathlib import Path
 
 import pytest
+import yaml
 
+from amccs import config
 from amccs.config import CaptureDefaults, DelaySettings, Settings, ZoomPoint, load_settings
 
 
@@ -18,6 +23,7 @@ def test_load_settings_parses_defaults(tmp_path: Path) -> None:
     settings:
       request_timeout_seconds: 12
       adb_command_timeout_seconds: 5
+      max_parallel_adb: 2
       camera_defaults:
         package: com.camera
         activity: .Main
@@ -38,6 +44,8 @@ def test_load_settings_parses_defaults(tmp_path: Path) -> None:
     assert isinstance(settings, Settings)
     assert settings.timeout == 12
     assert settings.adb_command_timeout == 5
+    assert settings.adb_persistent_shell is True
+    assert settings.max_parallel_adb == 2
     assert settings.defaults == CaptureDefaults(
         package="com.camera",
         activity=".Main",
@@ -111,3 +119,126 @@ def test_load_settings_rejects_unsafe_photo_location(tmp_path: Path) -> None:
 
     with pytest.raises(ValueError, match="must only contain"):
         load_settings(config_path)
+
+
+def test_load_settings_reuses_cached_result_until_file_changes(tmp_path: Path) -> None:
+    yaml_text = """
+    settings:
+      request_timeout_seconds: 12
+      camera_defaults:
+        package: com.camera
+        activity: .Main
+        photo_location: /sdcard/DCIM/Camera
+        zoom_point:
+          x: 0
+          y: 0
+        delays:
+          camera_open: 0
+          zoom: 0
+          photo_capture: 0
+          photo_save: 0
+    """
+    config_path = _write_config(tmp_path, yaml_text)
+
+    first = load_settings(config_path)
+    assert load_settings(config_path) is first
+
+    config_path.write_text(yaml_text.replace("12", "20"), encoding="utf-8")
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    reloaded = load_settings(config_path)
+    assert reloaded is not first
+    assert reloaded.timeout == 20
+
+
+def test_load_settings_reads_json_sidecar_when_enabled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    yaml_text = """
+    settings:
+      request_timeout_seconds: 7
+      camera_defaults:
+        package: com.camera
+        activity: .Main
+        photo_location: /sdcard/DCIM/Camera
+        zoom_point:
+          x: 0
+          y: 0
+        delays:
+          camera_open: 0
+          zoom: 0
+          photo_capture: 0
+          photo_save: 0
+    """
+    config_path = _write_config(tmp_path, yaml_text)
+    monkeypatch.setenv(config.CONFIG_CACHE_ENV_VAR, "1")
+
+    first = load_settings(config_path)
+    assert (tmp_path / "config.yaml.json").exists()
+
+    def _fail(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("YAML should not be re-parsed")
+
+    monkeypatch.setattr(config, "_SETTINGS_CACHE", OrderedDict())
+    monkeypatch.setattr(yaml, "load", _fail)
+
+    assert load_settings(config_path) == first
+
+
+def test_load_settings_rejects_non_ascii_photo_location(tmp_path: Path) -> None:
+    yaml_text = """
+    settings:
+      camera_defaults:
+        package: com.camera
+        activity: .Main
+        photo_location: /sdcard/DCIM/Caméra
+        zoom_point:
+          x: 0
+          y: 0
+        delays:
+          camera_open: 0
+          zoom: 0
+          photo_capture: 0
+          photo_save: 0
+    """
+    config_path = _write_config(tmp_path, yaml_text)
+
+    with pytest.raises(ValueError, match="must only contain"):
+        load_settings(config_path)
+
+
+def test_load_settings_accepts_json_documents(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.json"
+    config_path.write_text(
+        json.dumps(
+            {
+                "settings": {
+                    "request_timeout_seconds": 9,
+                    "camera_defaults": {
+                        "package": "com.camera",
+                        "activity": ".Main",
+                        "photo_location": "/sdcard/DCIM/Camera",
+                        "zoom_point": {"x": 1, "y": 2},
+                        "delays": {
+                            "camera_open": 0,
+                            "zoom": 0,
+                            "photo_capture": 0,
+                            "photo_save": 0,
+                        },
+                    },
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    settings = load_settings(config_path)
+
+    assert settings.timeout == 9
+    assert settings.defaults.zoom_point == ZoomPoint(x=1, y=2)
+
+
+@pytest.mark.skipif(not yaml.__with_libyaml__, reason="PyYAML built without LibYAML")
+def test_config_uses_libyaml_loader_when_available() -> None:
+    assert config._YamlLoader is yaml.CSafeLoader
@@ -1,24 +1,19 @@
 from __future__ import annotations
 
-import asyncio
-
 import pytest
 
-from amccs.adb import ADBClient
 from amccs.devices import CameraDevice, DeviceManager
 
 
-class StubADB(ADBClient):
+class StubADB:
     __slots__ = ("calls", "serials")
 
     def __init__(self, serials: list[str]) -> None:
-        super().__init__()
         self.serials = serials
         self.calls: list[str] = []
 
     async def list_devices(self) -> list[str]:
         self.calls.append("list_devices")
-        await asyncio.sleep(0)
         return self.serials
 
 
@@ -32,3 +27,20 @@ async def test_discover_returns_all_adb_devices() -> None:
     assert [device.serial for device in devices] == adb.serials
     assert all(isinstance(device, CameraDevice) for device in devices)
     assert adb.calls.count("list_devices") == 1
+
+
+@pytest.mark.asyncio
+async def test_discover_reuses_results_within_ttl() -> None:
+    adb = StubADB(["ZX1"])
+    manager = DeviceManager(adb, ttl=60)
+
+    first = await manager.discover()
+    second = await manager.discover()
+
+    assert [device.serial for device in second] == [device.serial for device in first]
+    assert adb.calls.count("list_devices") == 1
+
+    manager.invalidate()
+    await manager.discover()
+
+    assert adb.calls.count("list_devices") == 2
@@ -1,80 +1,161 @@
 from __future__ import annotations
 
-import asyncio
 import base64
-from collections.abc import Iterator
+import json
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
-
-from amccs.adb import ADBClient, ADBError
-from amccs.service import create_app
-
-
-class StubADB(ADBClient):
-    __slots__ = ("devices", "photo_bytes", "pull_calls", "remote_photo", "shell_calls")
+import pytest_asyncio
+from fastapi import FastAPI
+
+from amccs.adb import ADBError
+from amccs.service import (
+    CONFIG_ENV_VAR,
+    CONFIG_SEARCH_PATHS_ENV_VAR,
+    _log_event,
+    _resolve_config_path,
+    create_app,
+)
+
+_IMG = b"img-bytes"
+_DEVICES = ("SER123",)
+_EXPECTED_B64 = base64.b64encode(_IMG).decode("ascii")
+_TOKEN = "secret-token"  # noqa: S105 - test-only token literal
+_YAML_BYTES = b"""\
+settings:
+  request_timeout_seconds: 3
+  adb_command_timeout_seconds: 1.5
+  camera_defaults:
+    package: com.camera
+    activity: .Main
+    photo_location: /sdcard/DCIM/Camera
+    zoom_point:
+      x: 1
+      y: 2
+    delays:
+      camera_open: 0
+      zoom: 0
+      photo_capture: 0
+      photo_save: 0
+"""
+
+
+class StubADB:
+    __slots__ = (
+        "am_start_calls",
+        "devices",
+        "exec_out_calls",
+        "failure",
+        "photo_bytes",
+        "remote_photo",
+        "shell_calls",
+    )
 
     def __init__(self, *, devices: list[str], photo_bytes: bytes) -> None:
-        super().__init__()
         self.devices = devices
         self.photo_bytes = photo_bytes
         self.shell_calls: list[tuple[str, str]] = []
-        self.pull_calls: list[tuple[str, str, str]] = []
+        self.exec_out_calls: list[tuple[str, str]] = []
         self.remote_photo = "/sdcard/DCIM/latest.jpg"
+        self.am_start_calls = 0
+        self.failure: ADBError | None = None
+
+    def reset(self, *, devices: list[str], photo_bytes: bytes) -> None:
+        self.devices = devices
+        self.photo_bytes = photo_bytes
+        self.shell_calls.clear()
+        self.exec_out_calls.clear()
+        self.am_start_calls = 0
+        self.failure = None
 
     async def list_devices(self) -> list[str]:
-        await asyncio.sleep(0)
         return self.devices
 
     async def shell(self, serial: str, command: str, *, check: bool = True) -> str:
         self.shell_calls.append((serial, command))
-        await asyncio.sleep(0)
+        if self.failure is not None:
+            raise self.failure
+        if "am start" in command:
+            self.am_start_calls += 1
         if "ls -t" in command:
             return f"{self.remote_photo}\n"
         return "ok"
 
-    async def pull(self, serial: str, remote: str, local: str, *, check: bool = True) -> None:
-        self.pull_calls.append((serial, remote, local))
-        Path(local).write_bytes(self.photo_bytes)
-        await asyncio.sleep(0)
+    async def exec_out_bytes(self, serial: str, command: str, *, check: bool = True) -> bytes:
+        self.exec_out_calls.append((serial, command))
+        if self.failure is not None:
+            raise self.failure
+        return self.photo_bytes
 
 
 def _write_config(tmp_path: Path) -> Path:
-    yaml_text = """
-    settings:
-      request_timeout_seconds: 3
-      adb_command_timeout_seconds: 1.5
-      camera_defaults:
-        package: com.camera
-        activity: .Main
-        photo_location: /sdcard/DCIM/Camera
-        zoom_point:
-          x: 1
-          y: 2
-        delays:
-          camera_open: 0
-          zoom: 0
-          photo_capture: 0
-          photo_save: 0
-    """
     path = tmp_path / "config.yaml"
-    path.write_text(yaml_text, encoding="utf-8")
+    path.write_bytes(_YAML_BYTES)
     return path
 
 
-@pytest.fixture
-def app(tmp_path: Path) -> Iterator[tuple[TestClient, StubADB]]:
-    config_path = _write_config(tmp_path)
-    adb = StubADB(devices=["SER123"], photo_bytes=b"img-bytes")
+@asynccontextmanager
+async def _serve(application: FastAPI) -> AsyncIterator[httpx.AsyncClient]:
+    # Drive the lifespan ourselves: ASGITransport only forwards HTTP requests.
+    async with application.router.lifespan_context(application):
+        transport = httpx.ASGITransport(app=application)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            yield client
+
+
+@pytest_asyncio.fixture(scope="module")
+async def shared_app(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> AsyncIterator[tuple[httpx.AsyncClient, StubADB, FastAPI]]:
+    config_path = _write_config(tmp_path_factory.mktemp("service"))
+    adb = StubADB(devices=list(_DEVICES), photo_bytes=_IMG)
     application = create_app(config_path=str(config_path), adb_client=adb)
-    with TestClient(application) as client:
-        yield client, adb
+    async with _serve(application) as client:
+        yield client, adb, application
+
+
+@pytest_asyncio.fixture(scope="module")
+async def shared_token_app(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> AsyncIterator[tuple[httpx.AsyncClient, StubADB, FastAPI]]:
+    config_path = _write_config(tmp_path_factory.mktemp("service-token"))
+    adb = StubADB(devices=list(_DEVICES), photo_bytes=_IMG)
+    application = create_app(config_path=str(config_path), adb_client=adb, api_token=_TOKEN)
+    async with _serve(application) as client:
+        yield client, adb, application
+
+
+def _reset(adb: StubADB, application: FastAPI) -> None:
+    adb.reset(devices=list(_DEVICES), photo_bytes=_IMG)
+    runtime = application.state.amccs
+    runtime["primed_machines"] = None
+    runtime["device_manager"].invalidate()
+
+
+@pytest.fixture
+def app(
+    shared_app: tuple[httpx.AsyncClient, StubADB, FastAPI],
+) -> tuple[httpx.AsyncClient, StubADB]:
+    client, adb, application = shared_app
+    _reset(adb, application)
+    return client, adb
+
+
+@pytest.fixture
+def token_client(shared_token_app: tuple[httpx.AsyncClient, StubADB, FastAPI]) -> httpx.AsyncClient:
+    client, adb, application = shared_token_app
+    _reset(adb, application)
+    return client
 
 
-def test_root_reports_service_metadata(app: tuple[TestClient, StubADB]) -> None:
+@pytest.mark.asyncio
+async def test_root_reports_service_metadata(app: tuple[httpx.AsyncClient, StubADB]) -> None:
     client, _ = app
-    response = client.get("/")
+    response = await client.get("/")
     data = response.json()
 
     assert response.status_code == 200
@@ -83,9 +164,10 @@ def test_root_reports_service_metadata(app: tuple[TestClient, StubADB]) -> None:
     assert data["auth_enabled"] is False
 
 
-def test_health_lists_devices(app: tuple[TestClient, StubADB]) -> None:
+@pytest.mark.asyncio
+async def test_health_lists_devices(app: tuple[httpx.AsyncClient, StubADB]) -> None:
     client, _ = app
-    response = client.get("/health")
+    response = await client.get("/health")
     data = response.json()
 
     assert response.status_code == 200
@@ -95,9 +177,10 @@ def test_health_lists_devices(app: tuple[TestClient, StubADB]) -> None:
     assert data["devices"][0]["ok"] is True
 
 
-def test_capture_returns_base64_payload(app: tuple[TestClient, StubADB]) -> None:
+@pytest.mark.asyncio
+async def test_capture_returns_base64_payload(app: tuple[httpx.AsyncClient, StubADB]) -> None:
     client, adb = app
-    response = client.post("/capture")
+    response = await client.post("/capture")
     data = response.json()
 
     assert response.status_code == 200
@@ -105,83 +188,115 @@ def test_capture_returns_base64_payload(app: tuple[TestClient, StubADB]) -> None
     assert data["count"] == 1
 
     payload = data["devices"][0]
-    decoded = base64.b64decode(payload["image_base64"])
-    assert decoded == b"img-bytes"
+    assert payload["image_base64"] == _EXPECTED_B64
 
     assert any("am start" in command for _, command in adb.shell_calls)
-    assert adb.pull_calls
+    assert adb.exec_out_calls
 
 
-def test_prime_then_capture_reuses_prepared_state(app: tuple[TestClient, StubADB]) -> None:
+@pytest.mark.asyncio
+async def test_prime_then_capture_reuses_prepared_state(
+    app: tuple[httpx.AsyncClient, StubADB],
+) -> None:
     client, adb = app
 
-    prime_response = client.post("/prime")
+    prime_response = await client.post("/prime")
     assert prime_response.status_code == 200
     assert prime_response.json()["primed_devices"] == 1
 
-    am_start_calls_after_prime = sum(1 for _, command in adb.shell_calls if "am start" in command)
-    assert am_start_calls_after_prime == 1
+    assert adb.am_start_calls == 1
 
-    capture_response = client.post("/capture")
+    capture_response = await client.post("/capture")
     assert capture_response.status_code == 200
 
-    am_start_calls_after_capture = sum(1 for _, command in adb.shell_calls if "am start" in command)
-    assert am_start_calls_after_capture == 1  # no additional prepare run
+    assert adb.am_start_calls == 1  # no additional prepare run
+
+
+@pytest.mark.asyncio
+async def test_health_reports_no_devices(app: tuple[httpx.AsyncClient, StubADB]) -> None:
+    client, adb = app
+    adb.devices = []
+
+    response = await client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json() == {"service": "amccs", "status": "no-devices", "devices": []}
+    assert adb.shell_calls == []
 
 
-def test_prime_returns_400_when_no_devices(app: tuple[TestClient, StubADB]) -> None:
+@pytest.mark.asyncio
+async def test_prime_returns_400_when_no_devices(app: tuple[httpx.AsyncClient, StubADB]) -> None:
     client, adb = app
     adb.devices = []
 
-    response = client.post("/prime")
+    response = await client.post("/prime")
 
     assert response.status_code == 400
     assert response.json()["detail"]["message"] == "No ADB devices detected"
 
 
-def test_capture_returns_400_when_not_primed_and_no_devices(
-    app: tuple[TestClient, StubADB]
+@pytest.mark.asyncio
+async def test_capture_returns_400_when_not_primed_and_no_devices(
+    app: tuple[httpx.AsyncClient, StubADB],
 ) -> None:
     client, adb = app
     adb.devices = []
 
-    response = client.post("/capture")
+    response = await client.post("/capture")
 
     assert response.status_code == 400
     assert "No ADB devices detected" in response.json()["detail"]["message"]
 
 
-class ErrorADB(StubADB):
-    async def shell(self, serial: str, command: str, *, check: bool = True) -> str:
-        raise ADBError("boom")
+@pytest.mark.asyncio
+async def test_prime_returns_502_when_adb_fails(app: tuple[httpx.AsyncClient, StubADB]) -> None:
+    client, adb = app
+    adb.failure = ADBError("boom")
 
-    async def pull(self, serial: str, remote: str, local: str, *, check: bool = True) -> None:
-        raise ADBError("boom")
+    response = await client.post("/prime")
 
+    assert response.status_code == 502
 
-def test_prime_returns_502_when_adb_fails(tmp_path: Path) -> None:
-    config_path = _write_config(tmp_path)
-    adb = ErrorADB(devices=["SER123"], photo_bytes=b"img")
-    application = create_app(config_path=str(config_path), adb_client=adb)
 
-    with TestClient(application) as client:
-        response = client.post("/prime")
+@pytest.mark.parametrize(
+    ("path", "auth", "expected"),
+    [("/prime", False, 401), ("/prime", True, 200), ("/capture", True, 200)],
+)
+@pytest.mark.asyncio
+async def test_capture_requires_token_when_enabled(
+    token_client: httpx.AsyncClient, path: str, auth: bool, expected: int
+) -> None:
+    headers = {"Authorization": f"Bearer {_TOKEN}"} if auth else {}
 
-    assert response.status_code == 502
+    response = await token_client.post(path, headers=headers)
 
+    assert response.status_code == expected
 
-def test_capture_requires_token_when_enabled(tmp_path: Path) -> None:
+
+def test_resolve_config_path_returns_first_existing_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.delenv(CONFIG_ENV_VAR, raising=False)
+    monkeypatch.delenv(CONFIG_SEARCH_PATHS_ENV_VAR, raising=False)
+    directory_only = tmp_path / "as-directory"
+    (directory_only / "config.yaml").mkdir(parents=True)
     config_path = _write_config(tmp_path)
-    adb = StubADB(devices=["SER123"], photo_bytes=b"img-bytes")
-    token = "secret-token"  # noqa: S105 - test-only token literal
-    application = create_app(config_path=str(config_path), adb_client=adb, api_token=token)
 
-    with TestClient(application) as client:
-        unauthorized = client.post("/prime")
-        assert unauthorized.status_code == 401
+    resolved = _resolve_config_path(
+        extra_search_paths=[
+            tmp_path / "missing.yaml",
+            directory_only / "config.yaml",
+            config_path,
+        ]
+    )
+
+    assert resolved == config_path
+
 
-        response = client.post("/prime", headers={"Authorization": f"Bearer {token}"})
-        assert response.status_code == 200
+def test_log_event_emits_sorted_json(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(logging.INFO, logger="amccs"):
+        _log_event("capture.success", devices=2)
 
-        capture_response = client.post("/capture", headers={"Authorization": f"Bearer {token}"})
-        assert capture_response.status_code == 200
+    record = caplog.records[-1].getMessage()
+    assert json.loads(record) == {"devices": 2, "event": "capture.success", "service": "amccs"}
+    assert record.index('"devices"') < record.index('"event"') < record.index('"service"')
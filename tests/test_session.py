@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-import asyncio
-
 import pytest
 
 from amccs.devices import CameraDevice
 from amccs.session import CaptureSession
 from amccs.state_machine import CaptureArtifact
 
+_PREPARE = 1
+_CAPTURE = 2
+# events_order packs phases two bits at a time, oldest first.
+_PREPARE_THEN_CAPTURE = (_PREPARE << 2) | _CAPTURE
+
 
 class StubDeviceManager:
     def __init__(self, devices: list[CameraDevice]) -> None:
@@ -16,22 +19,24 @@ class StubDeviceManager:
 
     async def discover(self) -> list[CameraDevice]:
         self.calls.append("discover")
-        await asyncio.sleep(0)
         return self.devices
 
 
 class StubStateMachine:
     def __init__(self, serial: str) -> None:
         self.serial = serial
-        self.events: list[str] = []
+        self.events_mask = 0
+        self.events_order = 0
+
+    def _record(self, phase: int) -> None:
+        self.events_mask |= phase
+        self.events_order = (self.events_order << 2) | phase
 
     async def prepare(self) -> None:
-        self.events.append("prepare")
-        await asyncio.sleep(0)
+        self._record(_PREPARE)
 
     async def capture(self) -> CaptureArtifact:
-        self.events.append("capture")
-        await asyncio.sleep(0)
+        self._record(_CAPTURE)
         return CaptureArtifact(serial=self.serial, position=None, image_bytes=b"data")
 
 
@@ -55,7 +60,8 @@ async def test_capture_all_discovers_when_not_primed() -> None:
     artifacts = await session.capture_all()
 
     assert manager.calls == ["discover"]
-    assert all(machine.events == ["prepare", "capture"] for machine in machines.values())
+    assert all(machine.events_mask == _PREPARE | _CAPTURE for machine in machines.values())
+    assert all(machine.events_order == _PREPARE_THEN_CAPTURE for machine in machines.values())
     assert sorted(artifact.serial for artifact in artifacts) == ["A", "B"]
 
 
@@ -75,12 +81,12 @@ async def test_capture_all_uses_prepared_machines() -> None:
 
     machines = await session.prepare_all()
     assert manager.calls == ["discover"]
-    assert created[0].events == ["prepare"]
+    assert created[0].events_order == _PREPARE
 
     manager.calls.clear()
 
     artifacts = await session.capture_all(machines=machines)
 
     assert manager.calls == []  # no rediscovery when machines provided
-    assert created[0].events == ["prepare", "capture"]
+    assert created[0].events_order == _PREPARE_THEN_CAPTURE
     assert [artifact.serial for artifact in artifacts] == ["A"]
@@ -1,39 +1,39 @@
 from __future__ import annotations
 
 import asyncio
-from pathlib import Path
+import re
 
 import pytest
 
-from amccs.adb import ADBClient
+from amccs.adb import ADBError
 from amccs.config import CaptureDefaults, DelaySettings, ZoomPoint
 from amccs.state_machine import CameraStateMachine, CapturePhase
 
+_IMG = b"img-bytes"
+_TEST_BYTES = b"test-bytes"
 
-class RecordingADB(ADBClient):
-    __slots__ = ("photo_bytes", "pull_calls", "remote_photo", "shell_calls")
+
+class RecordingADB:
+    __slots__ = ("exec_out_calls", "photo_bytes", "remote_photo", "shell_calls")
 
     def __init__(self, photo_bytes: bytes) -> None:
-        super().__init__()
         self.photo_bytes = photo_bytes
         self.shell_calls: list[tuple[str, str]] = []
-        self.pull_calls: list[tuple[str, str, str]] = []
+        self.exec_out_calls: list[tuple[str, str]] = []
         self.remote_photo = "/sdcard/DCIM/latest.jpg"
 
     async def shell(self, serial: str, command: str, *, check: bool = True) -> str:
         self.shell_calls.append((serial, command))
-        await asyncio.sleep(0)
         if "ls -t" in command:
             return f"{self.remote_photo}\n"
         return "ok"
 
-    async def pull(self, serial: str, remote: str, local: str, *, check: bool = True) -> None:
-        self.pull_calls.append((serial, remote, local))
-        Path(local).write_bytes(self.photo_bytes)
-        await asyncio.sleep(0)
+    async def exec_out_bytes(self, serial: str, command: str, *, check: bool = True) -> bytes:
+        self.exec_out_calls.append((serial, command))
+        return self.photo_bytes
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def defaults() -> CaptureDefaults:
     return CaptureDefaults(
         package="com.camera.app",
@@ -46,7 +46,7 @@ def defaults() -> CaptureDefaults:
 
 @pytest.mark.asyncio
 async def test_state_machine_requires_prepare(defaults: CaptureDefaults) -> None:
-    adb = RecordingADB(b"test-bytes")
+    adb = RecordingADB(_TEST_BYTES)
     machine = CameraStateMachine(serial="ZX1", adb=adb, defaults=defaults)
 
     with pytest.raises(RuntimeError):
@@ -57,18 +57,71 @@ async def test_state_machine_requires_prepare(defaults: CaptureDefaults) -> None
 
 @pytest.mark.asyncio
 async def test_state_machine_runs_two_phases(defaults: CaptureDefaults) -> None:
-    adb = RecordingADB(b"img-bytes")
+    adb = RecordingADB(_IMG)
     machine = CameraStateMachine(serial="ZX1", adb=adb, defaults=defaults)
 
     await machine.prepare()
     assert machine.phase is CapturePhase.PREPARED
-    unlock_commands = "KEYCODE_WAKEUP" in " ".join(cmd for _, cmd in adb.shell_calls)
-    assert unlock_commands
+    assert len(adb.shell_calls) == 2  # batched prepare command + zoom tap
+    assert any("KEYCODE_WAKEUP" in cmd for _, cmd in adb.shell_calls)
 
     result = await machine.capture()
 
     assert result.serial == "ZX1"
-    assert result.image_bytes == b"img-bytes"
+    assert result.image_bytes is _IMG
     assert machine.phase is CapturePhase.COMPLETE
     assert any("rm -f" in command for _, command in adb.shell_calls)
-    assert adb.pull_calls
+    assert adb.exec_out_calls
+
+
+@pytest.mark.asyncio
+async def test_photo_wait_fits_inside_command_timeout(defaults: CaptureDefaults) -> None:
+    adb = RecordingADB(_IMG)
+    adb.remote_photo = ""  # the photo never shows up
+    machine = CameraStateMachine(serial="ZX1", adb=adb, defaults=defaults, command_timeout=1.5)
+
+    await machine.prepare()
+    with pytest.raises(ADBError, match="No photo captured"):
+        await machine.capture()
+
+    passes = [
+        int(match.group(1))
+        for _, command in adb.shell_calls
+        if (match := re.search(r"\$\(seq (\d+)\)", command))
+    ]
+    assert sum(passes) == 20  # the overall 20 x 0.3s wait is unchanged
+    assert all(count * 0.3 < 1.5 for count in passes)
+    assert not adb.exec_out_calls
+
+
+class SlowTransferADB(RecordingADB):
+    __slots__ = ("active_transfers", "peak_transfers")
+
+    def __init__(self, photo_bytes: bytes) -> None:
+        super().__init__(photo_bytes)
+        self.active_transfers = 0
+        self.peak_transfers = 0
+
+    async def exec_out_bytes(self, serial: str, command: str, *, check: bool = True) -> bytes:
+        self.active_transfers += 1
+        self.peak_transfers = max(self.peak_transfers, self.active_transfers)
+        await asyncio.sleep(0.01)
+        self.active_transfers -= 1
+        return await super().exec_out_bytes(serial, command, check=check)
+
+
+@pytest.mark.asyncio
+async def test_state_machines_share_transfer_slots(defaults: CaptureDefaults) -> None:
+    adb = SlowTransferADB(_IMG)
+    slots = asyncio.Semaphore(1)
+    machines = [
+        CameraStateMachine(serial=serial, adb=adb, defaults=defaults, transfer_slots=slots)
+        for serial in ("A", "B", "C")
+    ]
+    for machine in machines:
+        await machine.prepare()
+
+    results = await asyncio.gather(*(machine.capture() for machine in machines))
+
+    assert [result.serial for result in results] == ["A", "B", "C"]
+    assert adb.peak_transfers == 1